@@ -1,50 +1,54 @@
 
 def convert_fai_to_indexes(fai_file):
 
+    import mmap
+    import os
+    import re
+    import stat
     import sys
 
-    # Initialize the variables
-    # The desired structure for LEXICO_2_IND maps chromosome name to a numeric index.
-    lexico_2_ind = {}
-    # T2T_CHROMSIZE maps chromosome name to its length (size).
-    t2t_chromsize = {}
-
-    chrom_digits = []
+    # (chrom_name, raw size bytes) for every line with at least two columns
+    all_fields = []
 
-    # Keep track of the index for LEXICO_2_IND
-    # This index will be assigned sequentially based on the order in the FAI file.
-    current_index = 1
+    def scan_lines(buf):
+        # An FAI file is tab-separated. Lines end in \n, \r\n or a bare \r, as with
+        # universal newlines, and only the first two fields of each line are split out.
+        for line in re.finditer(rb'[^\r\n]+', buf):
+            fields = line.group().strip().split(b'\t', 2)
+            if len(fields) >= 2:
+                all_fields.append((fields[0].decode(), fields[1]))
 
     try:
-        with open(fai_file, 'r') as f:
-            # Read the file line by line
-            for line in f:
-                # An FAI file is tab-separated. Split the line into fields.
-                fields = line.strip().split('\t')
-
-                if len(fields) >= 2:
-                    chrom_name = fields[0]
-                    chr_digit = chrom_name.replace("chr","")
-                    chrom_digits.append(str(chr_digit))
-                    try:
-                        chrom_size = int(fields[1])
-                    except ValueError:
-                        # Skip lines where the size is not a valid integer
-                        print(f"Warning: Could not convert size for '{chrom_name}'. Skipping.", file=sys.stderr)
-                        continue
-
-                    # Populate T2T_CHROMSIZE
-                    t2t_chromsize[chrom_name] = chrom_size
-
-                    # Populate LEXICO_2_IND with the sequential index
-                    lexico_2_ind[chrom_name] = current_index
-
-                    # Increment the index for the next chromosome
-                    current_index += 1
+        with open(fai_file, 'rb') as f:
+            st = os.fstat(f.fileno())
+            # mmap only works on a non-empty regular file; pipes, FIFOs and
+            # /dev/stdin report a size of 0 so they are read in full instead
+            if stat.S_ISREG(st.st_mode) and st.st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    scan_lines(mm)
+            else:
+                scan_lines(f.read())
     except FileNotFoundError:
         print(f"Error: FAI file not found at '{fai_file}'. Please check the file path.", file=sys.stderr)
         # Exit the script or handle the error as appropriate
         sys.exit(1)
+
+    chrom_digits = [chrom_name.replace("chr","") for chrom_name,_ in all_fields]
+
+    chrom_sizes = []
+    for chrom_name, size_field in all_fields:
+        try:
+            chrom_sizes.append((chrom_name, int(size_field)))
+        except ValueError:
+            # Skip lines where the size is not a valid integer
+            print(f"Warning: Could not convert size for '{chrom_name}'. Skipping.", file=sys.stderr)
+
+    # T2T_CHROMSIZE maps chromosome name to its length (size).
+    t2t_chromsize = dict(chrom_sizes)
+    # The desired structure for LEXICO_2_IND maps chromosome name to a numeric index.
+    # This index is assigned sequentially based on the order in the FAI file.
+    lexico_2_ind = {chrom_name:i for i,(chrom_name,_) in enumerate(chrom_sizes, start=1)}
+
     if "chrU" not in lexico_2_ind:
-        lexico_2_ind["chrU"] = current_index
+        lexico_2_ind["chrU"] = len(chrom_sizes) + 1
     return t2t_chromsize, lexico_2_ind, chrom_digits
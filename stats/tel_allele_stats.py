@@ -2,8 +2,11 @@ import pandas as pd
 import numpy as np
 import sys
 import io
+import re
 
-def generate_tlens_summary(input_data):
+SEX_CHR_PATTERN = re.compile(r'[XY]', re.IGNORECASE)
+
+def generate_tlens_summary(input_data, out=None):
     """
     Analyzes tlens_by_allele data to produce a simplified summary of TL-75 values.
     
@@ -13,14 +16,21 @@ def generate_tlens_summary(input_data):
 
     Args:
         input_data (str or io.TextIOWrapper): The path to the input TSV file or the file content.
+        out (str or io.TextIOBase, optional): Path or file object the summary is written to.
+            A path is only opened once the input has been read and both tables computed,
+            so a bad input never leaves an empty output file behind. If None, the summary
+            is collected in memory and returned.
         
     Returns:
-        str: A string containing the two-part summary in TSV format.
+        str or None: A string containing the two-part summary in TSV format if out is None.
+            If a file-like input_data can't be read, an "Error reading data: ..." string is
+            returned instead, whether or not out is given, and nothing is written.
     """
     
     try:
         # Load the TSV data. pd.read_csv can handle both a file path and a file-like object.
-        df = pd.read_csv(input_data, sep='\t')
+        # Only the two columns used below are parsed.
+        df = pd.read_csv(input_data, sep='\t', usecols=lambda col: col in ('#chr', 'TL_p75'), dtype={'#chr': str})
     except Exception as e:
         # If input_data is a file path and it fails to read, return an error.
         if isinstance(input_data, str):
@@ -40,29 +50,28 @@ def generate_tlens_summary(input_data):
     df['TL_p75'] = pd.to_numeric(df['TL_p75'], errors='coerce')
     # Drop any rows where TL_p75 could not be converted
     df.dropna(subset=['TL_p75'], inplace=True)
+    df['TL_p75'] = df['TL_p75'].astype(np.int64)
     
     # --- Part 1: Calculate Maximum TL-75 for each Chromosome End ---
 
-    max_tl_by_end = {}
-
-    # Iterate through the dataframe to handle rows with multiple telomere ends
-    for index, row in df.iterrows():
-        tl_p75 = int(row['TL_p75'])
-
-        # Split the '#chr' column by comma to get individual telomere ends
-        chr_ends = str(row['#chr']).split(',')
-        
-        for end in chr_ends:
-            end = end.strip()
-            if not end:
-                continue
+    # Split the '#chr' column by comma so that rows with multiple telomere ends
+    # contribute their TL_p75 to each of those ends
+    # A blank '#chr' cell is reported as a 'nan' end, as str() would render it
+    chr_ends = df['#chr'].fillna('nan').astype(str).str.split(',').explode().str.strip()
+    chr_ends = chr_ends[chr_ends.astype(bool)]
+    tl_p75 = df['TL_p75'].reindex(chr_ends.index)
 
-            # Update the dictionary with the maximum TL_p75 value seen for this end
-            max_tl_by_end[end] = max(max_tl_by_end.get(end, -1), tl_p75)
-
-    # Convert the results to a DataFrame for easier processing and sorting
-    max_tl_df = pd.DataFrame(max_tl_by_end.items(), columns=['Telomere_End', 'Max_TL_p75'])
-    max_tl_df = max_tl_df.sort_values(by='Telomere_End').reset_index(drop=True)
+    # Sort ends (keeping TL_p75 values aligned) so that each end is a contiguous run,
+    # then take the maximum TL_p75 value seen over each run
+    ends = chr_ends.to_numpy()
+    vals = tl_p75.to_numpy(np.int64)
+    order = np.argsort(ends, kind='stable')
+    ends = ends[order]
+    vals = vals[order]
+    # ends is already sorted, so each run starts wherever the end changes
+    run_starts = np.flatnonzero(np.r_[True, ends[1:] != ends[:-1]]) if ends.size else np.empty(0, dtype=np.intp)
+    uniq_ends = ends[run_starts]
+    max_tl_df = pd.DataFrame({'Telomere_End': uniq_ends, 'Max_TL_p75': np.maximum.reduceat(vals, run_starts)})
     
     # --- Part 2: Calculate Summary Statistics ---
     
@@ -70,10 +79,7 @@ def generate_tlens_summary(input_data):
     all_tl_values = max_tl_df['Max_TL_p75']
     
     # Autosomes Only (Filter out ends containing 'X' or 'Y', case-insensitive)
-    autosomes_df = max_tl_df[
-        ~max_tl_df['Telomere_End'].str.contains('X', case=False, na=False) &
-        ~max_tl_df['Telomere_End'].str.contains('Y', case=False, na=False)
-    ]
+    autosomes_df = max_tl_df[~max_tl_df['Telomere_End'].str.contains(SEX_CHR_PATTERN, na=False)]
     autosomes_tl_values = autosomes_df['Max_TL_p75']
 
     def calculate_stats(series, name):
@@ -81,14 +87,16 @@ def generate_tlens_summary(input_data):
         if series.empty:
             return {'Count': 'N/A', 'Min': 'N/A', 'Max': 'N/A', 'Median': 'N/A', 'Mean': 'N/A', 'Stdev_Sample': 'N/A'}
             
+        # Reduce over the underlying array rather than going through pandas per statistic
+        values = series.to_numpy()
         stats = {
-            'Count': len(series),
-            'Min': series.min(),
-            'Max': series.max(),
-            'Median': series.median(),
-            'Mean': series.mean().round(2),
-            # Use ddof=1 for sample standard deviation (stdev)
-            'Stdev_Sample': series.std(ddof=1).round(2) 
+            'Count': values.size,
+            'Min': values.min(),
+            'Max': values.max(),
+            'Median': np.median(values),
+            'Mean': values.mean().round(2),
+            # Use ddof=1 for sample standard deviation (stdev), undefined for a single value
+            'Stdev_Sample': values.std(ddof=1).round(2) if values.size > 1 else np.nan
         }
         
         return stats
@@ -106,31 +114,38 @@ def generate_tlens_summary(input_data):
     }
     summary_df = pd.DataFrame(summary_data)
     
-    # --- Part 3: Generate Final TSV Output String ---
-    
-    # Capture Part 1 TSV output
-    part1_header = "# Part 1: Maximum TL-75 for each Chromosome End (Max TL-75 per Telomere End)"
-    part1_tsv = max_tl_df.to_csv(None, sep='\t', index=False)
-    
-    # Capture Part 2 TSV output
-    part2_header = "\n#\n# Part 2: Overall Summary Statistics on Max TL-75 Values"
-    part2_note = "# 'Autosomes_Only' excludes chrX and chrY ends."
-    part2_tsv = summary_df.to_csv(None, sep='\t', index=False)
+    # --- Part 3: Write Final TSV Output ---
 
-    # Combine all parts
-    output = "\n".join([
-        "# Simplified TL-75 Summary from tlens_by_allele.tsv",
-        "#",
-        part1_header,
-        "#",
-        part1_tsv.strip(),
-        part2_header,
-        part2_note,
-        "#",
-        part2_tsv.strip()
-    ])
+    if isinstance(out, str):
+        with open(out, 'w') as f:
+            _write_tlens_summary(max_tl_df, summary_df, f)
+        return None
+
+    return_string = out is None
+    if return_string:
+        out = io.StringIO()
+    _write_tlens_summary(max_tl_df, summary_df, out)
+
+    if return_string:
+        return out.getvalue()
+
+def _write_tlens_summary(max_tl_df, summary_df, out):
+    """Writes the two-part TSV summary to the file object out."""
+    out.write("# Simplified TL-75 Summary from tlens_by_allele.tsv\n")
+    out.write("#\n")
     
-    return output
+    # Part 1 TSV output
+    out.write("# Part 1: Maximum TL-75 for each Chromosome End (Max TL-75 per Telomere End)\n")
+    out.write("#\n")
+    max_tl_df.to_csv(out, sep='\t', index=False)
+    
+    # Part 2 TSV output
+    out.write("\n#\n# Part 2: Overall Summary Statistics on Max TL-75 Values\n")
+    out.write("# 'Autosomes_Only' excludes chrX and chrY ends.\n")
+    out.write("#\n")
+    # Stripped as the summary always was: no trailing newline, and no trailing
+    # tabs from empty (NaN) cells on the last row
+    out.write(summary_df.to_csv(None, sep='\t', index=False).strip())
 
 if __name__ == "__main__":
     
@@ -143,15 +158,12 @@ if __name__ == "__main__":
     input_file = sys.argv[1]
     output_file = sys.argv[2]
         
-    # Generate the result
-    result = generate_tlens_summary(input_file)
-    
-    # Write the result to the specified output file
+    # Generate the result directly into the specified output file. The file is only
+    # created once the input has been read and summarised.
     try:
-        with open(output_file, 'w') as f:
-            f.write(result)
+        generate_tlens_summary(input_file, output_file)
         # Note: In a live environment, you would print a success message, 
         # but in this context, the file is automatically provided.
-    except Exception as e:
+    except OSError as e:
         sys.stderr.write(f"Error writing to output file '{output_file}': {e}\n")
         sys.exit(1)
@@ -1,12 +1,38 @@
-import pandas as pd
+import numpy as np
 import argparse
+import csv
 import re
 import sys
 import os
 
+_NAT_RE = re.compile('([0-9]+)')
+
 def natural_sort_key(s):
     return [int(text) if text.isdigit() else text.lower()
-            for text in re.split('([0-9]+)', s)]
+            for text in _NAT_RE.split(s)]
+
+def natural_sort(ends):
+    """Same ordering as sorted(ends, key=natural_sort_key), computed with a single lexsort."""
+    ends = list(ends)
+    if not ends:
+        return ends
+    # Keys alternate text / number tokens; pad shorter keys so they sort
+    # before longer ones sharing a prefix
+    keys = [natural_sort_key(e) for e in ends]
+    # Digit runs too long for int64 can't go in a typed column; Python ints have no limit
+    int64_max = np.iinfo(np.int64).max
+    if any(k[i] > int64_max for k in keys for i in range(1, len(k), 2)):
+        return sorted(ends, key=natural_sort_key)
+    n_cols = max(len(k) for k in keys)
+    # Each token position becomes its own contiguous typed array (int64 for numbers,
+    # fixed-width unicode for text) so lexsort compares in C rather than on objects
+    sort_keys = []
+    for i in range(n_cols):
+        pad, dtype = (-1, np.int64) if i % 2 else ('', str)
+        sort_keys.append(np.array([k[i] if i < len(k) else pad for k in keys], dtype=dtype))
+    # np.lexsort treats the last key as the primary one
+    order = np.lexsort(sort_keys[::-1])
+    return np.asarray(ends)[order].tolist()
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a chromosome ends report from telomere length data.")
@@ -30,80 +56,79 @@ def main():
         sys.exit(1)
 
     # 1. Process FAI to determine all expected chromosome ends (p and q)
-    expected_ends = []
     try:
         with open(args.fai, 'r') as f:
-            for line in f:
-                if line.strip():
-                    chrom = line.split('\t')[0]
-                    expected_ends.append(f"{chrom}p")
-                    expected_ends.append(f"{chrom}q")
+            chroms = np.array([line.split('\t')[0] for line in f if line.strip()], dtype=str)
     except Exception as e:
         print(f"Error reading FAI file: {e}")
         sys.exit(1)
+    # Keep FAI order (de-duplicated) so ends that tie under natural_sort_key
+    # are reported in the same order on every run
+    expected_ends = list(dict.fromkeys(np.char.add(np.repeat(chroms, 2), np.tile(['p', 'q'], len(chroms))).tolist()))
         
     # 2. Process TSV for found/ambiguous ends
-    try:
-        df = pd.read_csv(args.input, sep='\t')
-    except Exception as e:
-        print(f"Error reading input file: {e}")
-        sys.exit(1)
-        
     found_ends = set()
     ambiguous_set = set()
     total_count = 0
     unambiguous_count = 0
     
-    # Ensure correct column name handling
-    chr_col = '#chr' if '#chr' in df.columns else 'chr'
-    if chr_col not in df.columns:
-        print(f"Error: Column '#chr' (or 'chr') not found in {args.input}")
-        sys.exit(1)
-    
-    for entry in df[chr_col]:
-        # Handle comma-separated multi-mappings
-        parts = [p.strip() for p in str(entry).split(',')]
-        total_count += len(parts)
-        
-        if len(parts) > 1:
-            for p in parts:
-                ambiguous_set.add(p)
-        else:
-            unambiguous_count += 1
+    try:
+        with open(args.input, 'r', newline='') as f:
+            reader = csv.reader(f, delimiter='\t')
+            header = next(reader, [])
+            
+            # Ensure correct column name handling
+            chr_col = '#chr' if '#chr' in header else 'chr'
+            if chr_col not in header:
+                print(f"Error: Column '#chr' (or 'chr') not found in {args.input}")
+                sys.exit(1)
+            chr_ind = header.index(chr_col)
             
-        for p in parts:
-            found_ends.add(p)
+            for row in reader:
+                if not row:
+                    continue
+                # A short row or blank cell is a missing value, which pandas rendered as 'nan'
+                entry = (row[chr_ind] if chr_ind < len(row) else '') or 'nan'
+                # Handle comma-separated multi-mappings
+                parts = [p.strip() for p in entry.split(',')]
+                total_count += len(parts)
+                
+                if len(parts) > 1:
+                    ambiguous_set.update(parts)
+                else:
+                    unambiguous_count += 1
+                    
+                found_ends.update(parts)
+    except Exception as e:
+        print(f"Error reading input file: {e}")
+        sys.exit(1)
             
     # 3. Calculate missing ends (Expected - Found)
-    missing_ends = sorted([e for e in expected_ends if e not in found_ends], key=natural_sort_key)
-    ambiguous_ends_sorted = sorted(list(ambiguous_set), key=natural_sort_key)
-    
-    # 4. Format the output table
-    output_lines = []
-    output_lines.append("Chromosome ends")
-    output_lines.append("")
-    output_lines.append(f"{'unambiguous':<15} {'total':<10}")
-    output_lines.append(f"{unambiguous_count:<15} {total_count:<10}")
-    output_lines.append("")
-    output_lines.append(f"{'ambiguous ends':<23} {'missing end':<20}")
+    missing_ends = natural_sort([e for e in expected_ends if e not in found_ends])
+    ambiguous_ends_sorted = natural_sort(ambiguous_set)
     
+    # 4. Format the output table and write it to file
     max_rows = max(len(ambiguous_ends_sorted), len(missing_ends))
     
-    if max_rows == 0:
-        output_lines.append(f"{'none':<23} {'none':<20}")
-    else:
-        for i in range(max_rows):
-            ambig = ambiguous_ends_sorted[i] if i < len(ambiguous_ends_sorted) else ""
-            if not missing_ends:
-                miss = "none" if i == 0 else ""
-            else:
-                miss = missing_ends[i] if i < len(missing_ends) else ""
-            output_lines.append(f"{ambig:<23} {miss:<20}")
-            
-    # 5. Write to file
     try:
-        with open(args.output, 'w') as out:
-            out.write("\n".join(output_lines) + "\n")
+        with open(args.output, 'w', buffering=1<<16) as out:
+            out.write("Chromosome ends\n")
+            out.write("\n")
+            out.write(f"{'unambiguous':<15} {'total':<10}\n")
+            out.write(f"{unambiguous_count:<15} {total_count:<10}\n")
+            out.write("\n")
+            out.write(f"{'ambiguous ends':<23} {'missing end':<20}\n")
+            
+            if max_rows == 0:
+                out.write(f"{'none':<23} {'none':<20}\n")
+            else:
+                for i in range(max_rows):
+                    ambig = ambiguous_ends_sorted[i] if i < len(ambiguous_ends_sorted) else ""
+                    if not missing_ends:
+                        miss = "none" if i == 0 else ""
+                    else:
+                        miss = missing_ends[i] if i < len(missing_ends) else ""
+                    out.write(f"{ambig:<23} {miss:<20}\n")
         print(f"Report successfully saved to: {args.output}")
     except Exception as e:
         print(f"Error writing output file: {e}")